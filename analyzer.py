@@ -1,9 +1,22 @@
+import io
 import re
+import json
+import time
 import hashlib
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel
+from tenacity import (retry, retry_if_exception_type, stop_after_attempt,
+                      wait_random_exponential)
 from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
+
+import storage as db
+
+try:
+    import ahocorasick
+except ImportError:  # optional; fall back to a single compiled regex
+    ahocorasick = None
 
 
 _vader = SentimentIntensityAnalyzer()
@@ -18,7 +31,40 @@ IMPACT_KEYWORDS = {
     "probe": -0.7, "downgrade": -0.6, "guidance cut": -1.0, "recall": -0.8,
 }
 
-CASHTAG_RE = re.compile(r"\$[A-Z]{1,5}\b")
+# $AAPL-style cashtag, not glued to a preceding word (e.g. "US$ABC");
+# the trailing \b rejects 6+ letter runs like "$ABCDEF"
+CASHTAG_RE = re.compile(r"(?<![\w$])\$([A-Z]{1,5})\b")
+# Cashtags sit in titles/ledes; don't scan the tail of long articles
+CASHTAG_SCAN_CHARS = 8000
+
+# VADER goes quadratic on emoji/emoticon-heavy input; bound what we feed it
+VADER_MAX_CHARS = 3000
+VADER_MAX_SENTENCES = 40
+_NON_ASCII_RE = re.compile(r"[^\x00-\x7F]+")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _build_keyword_matcher():
+    # One pass over the text regardless of how many keywords there are
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for k in IMPACT_KEYWORDS:
+            automaton.add_word(k, k)
+        automaton.make_automaton()
+        return lambda t: {k for _, k in automaton.iter(t)}
+    # Regex fallback: one lookahead per keyword length. The lookahead catches
+    # overlaps starting at different positions ("lowers guidance cut"); the
+    # length groups catch keywords that prefix each other at the same position
+    # (an alternation would only report one), matching the automaton above.
+    by_len: Dict[int, List[str]] = {}
+    for k in IMPACT_KEYWORDS:
+        by_len.setdefault(len(k), []).append(k)
+    patterns = [re.compile("(?=(" + "|".join(map(re.escape, ks)) + "))")
+                for ks in by_len.values()]
+    return lambda t: {m.group(1) for p in patterns for m in p.finditer(t)}
+
+
+_match_keywords = _build_keyword_matcher()
 
 class ArticleAnalysis(BaseModel):
     title: str
@@ -36,29 +82,50 @@ class ArticleAnalysis(BaseModel):
 
 def extract_tickers(text: str) -> List[str]:
     # Find $AAPL-style cashtags and unique them
-    tags = set(x[1:] for x in CASHTAG_RE.findall(text or ""))
+    tags = {m.group(1) for m in CASHTAG_RE.finditer((text or "")[:CASHTAG_SCAN_CHARS])}
     return sorted(tags)
 
 
 def naive_catalyst_score(text: str) -> float:
     if not text:
         return 0.0
-    t = text.lower()
-    score = 0.0
-    for k, w in IMPACT_KEYWORDS.items():
-        if k in t:
-            score += w
-    return score
+    return naive_catalyst_score_pre(text.lower())
 
 
-def _hash(s: str) -> str:
-    return hashlib.sha1(s.encode("utf-8")).hexdigest()
+def naive_catalyst_score_pre(low: str) -> float:
+    """
+    naive_catalyst_score for text the caller has already lowercased.
+    """
+    # Each keyword counts once, however often it appears
+    return sum(IMPACT_KEYWORDS[k] for k in _match_keywords(low))
 
 
-def summarize_with_openai(_client: OpenAI, title: str, text: str) -> Tuple[List[str], List[str]]:
+def vader_sentiment(text: str) -> float:
     """
-    Returns (key_points, model_found_tickers)
+    Mean VADER compound (-1..1) over the first VADER_MAX_SENTENCES sentences
+    of text, with non-ASCII stripped and length capped.
     """
+    safe_text = _NON_ASCII_RE.sub(" ", text or "")[:VADER_MAX_CHARS]
+    sentences = [x for x in _SENTENCE_SPLIT_RE.split(safe_text)
+                 if x.strip()][:VADER_MAX_SENTENCES]
+    if not sentences:
+        return 0.0
+    return sum(_vader.polarity_scores(x)["compound"] for x in sentences) / len(sentences)
+
+
+def _hash(s: str, _h=hashlib.blake2b) -> str:
+    # Non-cryptographic key (cache/batch ids): BLAKE2b is faster than SHA-1
+    return _h(s.encode("utf-8"), digest_size=16).hexdigest()
+
+
+SUMMARY_MODEL = "gpt-5-mini-2025-08-07"
+# Key points rarely depend on the article's tail, and 3-5 bullets of JSON
+# fit comfortably in 400 output tokens; both bound per-call latency.
+SUMMARY_INPUT_CHARS = 3000
+SUMMARY_MAX_TOKENS = 400
+
+
+def _summary_messages(title: str, text: str) -> List[Dict]:
     prompt = f"""
 You are an equity news analyst. Given the article below, extract:
 1) 3-5 bullet key points (short, factual, investor-relevant)
@@ -68,36 +135,202 @@ Return JSON with keys: key_points[], tickers[].
 
 TITLE: {title}
 ARTICLE:
-{text[:5000]}
+{text[:SUMMARY_INPUT_CHARS]}
 """
-    resp = _client.chat.completions.create(
-        model="gpt-5-mini-2025-08-07",
-        response_format={"type": "json_object"},
-        messages=[{"role": "user", "content": prompt}],
-    )
+    return [{"role": "user", "content": prompt}]
+
+
+def _summary_request(title: str, text: str) -> Dict:
+    # Shared by the sync, async and Batch API paths
+    return {
+        "model": SUMMARY_MODEL,
+        "response_format": {"type": "json_object"},
+        "messages": _summary_messages(title, text),
+        # gpt-5 models reject temperature/top_p/max_tokens; minimal reasoning
+        # keeps the completion budget for the answer itself
+        "reasoning_effort": "minimal",
+        "max_completion_tokens": SUMMARY_MAX_TOKENS,
+    }
+
+
+class SummaryTruncatedError(ValueError):
+    """
+    The model stopped on the token cap or returned nothing. Not retried: the
+    article is left unsaved so the next pipeline run picks it up again.
+    """
+
+
+def _parse_summary(resp) -> Tuple[List[str], List[str]]:
     try:
         data = resp.choices[0].message.parsed if hasattr( # type: ignore
             resp.choices[0].message, "parsed") else None
     except Exception:
         data = None
-    if not data:
-        import json
-        data = json.loads(resp.choices[0].message.content) # type: ignore
+    if data:
+        return _summary_fields(data)
+    return _summary_from_reply(resp.choices[0].finish_reason,
+                               resp.choices[0].message.content)
+
+
+def _summary_from_reply(finish_reason: Optional[str], content: Optional[str]) -> Tuple[List[str], List[str]]:
+    # Reasoning tokens count against SUMMARY_MAX_TOKENS, so a "length" stop can
+    # leave no (or half a) JSON body
+    if finish_reason == "length" or not (content or "").strip():
+        raise SummaryTruncatedError(f"summary reply unusable (finish_reason={finish_reason!r})")
+    return _summary_fields(json.loads(content))  # type: ignore
+
+
+def _summary_fields(data: Dict) -> Tuple[List[str], List[str]]:
     key_points = data.get("key_points", [])
     tickers = data.get("tickers", [])
     return key_points, tickers
 
 
-def analyze_article(client: OpenAI, item: Dict, full_text: str) -> ArticleAnalysis:
+def _summary_key(title: str, text: str) -> str:
+    # Hash exactly what the prompt sees, so wire reprints share an entry
+    return _hash(title + "\n" + text[:SUMMARY_INPUT_CHARS])
+
+
+def _cached_summary(key: str) -> Optional[Tuple[List[str], List[str]]]:
+    hit = db.get_llm_cache(key)
+    return _summary_fields(hit) if hit is not None else None
+
+
+def _cache_summary(key: str, summary: Tuple[List[str], List[str]]):
+    key_points, tickers = summary
+    db.put_llm_cache(key, {"key_points": key_points, "tickers": tickers})
+
+
+def summarize_with_openai(_client: OpenAI, title: str, text: str) -> Tuple[List[str], List[str]]:
+    """
+    Returns (key_points, model_found_tickers)
+    """
+    key = _summary_key(title, text)
+    cached = _cached_summary(key)
+    if cached is not None:
+        return cached
+    resp = _client.chat.completions.create(**_summary_request(title, text))  # type: ignore
+    summary = _parse_summary(resp)
+    _cache_summary(key, summary)
+    return summary
+
+
+# Only transient API failures are worth paying for again; bad requests and
+# unparseable replies fail the same way every time.
+_RETRYABLE = (openai.RateLimitError, openai.APIConnectionError,
+              openai.APITimeoutError, openai.InternalServerError)
+
+
+@retry(retry=retry_if_exception_type(_RETRYABLE), wait=wait_random_exponential(min=1, max=30),
+       stop=stop_after_attempt(5), reraise=True)
+async def summarize_with_openai_async(_client: AsyncOpenAI, title: str, text: str) -> Tuple[List[str], List[str]]:
+    """
+    Async variant of summarize_with_openai; transient API errors (rate limits,
+    timeouts, 5xx) are retried with exponential backoff under concurrency.
+    """
+    key = _summary_key(title, text)
+    cached = _cached_summary(key)
+    if cached is not None:
+        return cached
+    resp = await _client.chat.completions.create(**_summary_request(title, text))  # type: ignore
+    summary = _parse_summary(resp)
+    _cache_summary(key, summary)
+    return summary
+
+
+BATCH_POLL_SECONDS = 30
+# Don't hold the scheduler thread (and the pipeline lock) for the full 24h
+# completion window; past this, cancel and let the async path take over.
+BATCH_MAX_WAIT_SECONDS = 30 * 60
+_BATCH_DONE = {"completed", "failed", "expired", "cancelled"}
+
+
+def summarize_batch(_client: OpenAI, pending: List[Tuple[Dict, str]]) -> Dict[str, Tuple[List[str], List[str]]]:
+    """
+    Summarize many articles through the OpenAI Batch API (half the price of
+    synchronous calls, no per-request RPM cap). Blocks until the batch finishes
+    or BATCH_MAX_WAIT_SECONDS pass, in which case the batch is cancelled.
+    pending: list of (rss_item, full_text)
+    Returns {url: (key_points, model_found_tickers)}; articles whose request
+    failed are simply missing from the result.
+    """
+    out: Dict[str, Tuple[List[str], List[str]]] = {}
+    by_id: Dict[str, Tuple[str, str]] = {}  # custom_id -> (url, cache key)
+    lines = []
+    for item, full_text in pending:
+        custom_id = _hash(item["link"])
+        if custom_id in by_id or item["link"] in out:
+            continue
+        text = full_text or item.get("summary", "")
+        key = _summary_key(item["title"], text)
+        cached = _cached_summary(key)
+        if cached is not None:
+            out[item["link"]] = cached
+            continue
+        by_id[custom_id] = (item["link"], key)
+        lines.append(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _summary_request(item["title"], text),
+        }))
+    if not lines:
+        return out
+
+    upload = _client.files.create(
+        file=("summaries.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+        purpose="batch",
+    )
+    batch = _client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    deadline = time.monotonic() + BATCH_MAX_WAIT_SECONDS
+    while batch.status not in _BATCH_DONE:
+        if time.monotonic() >= deadline:
+            try:
+                _client.batches.cancel(batch.id)
+            except Exception:
+                pass
+            return out  # uncached articles are missing -> caller falls back
+        time.sleep(BATCH_POLL_SECONDS)
+        batch = _client.batches.retrieve(batch.id)
+
+    # Expired/cancelled batches can still carry partial output
+    if not batch.output_file_id:
+        return out
+    for ln in _client.files.content(batch.output_file_id).text.splitlines():
+        if not ln.strip():
+            continue
+        row = json.loads(ln)
+        resp = row.get("response") or {}
+        if row.get("error") or resp.get("status_code") != 200:
+            continue
+        try:
+            choice = resp["body"]["choices"][0]
+            url, key = by_id[row["custom_id"]]
+            # Truncated/empty replies raise and stay out of `out`, so the
+            # caller sends them through the async path
+            summary = _summary_from_reply(
+                choice.get("finish_reason"), choice["message"].get("content"))
+            out[url] = summary
+            _cache_summary(key, summary)
+        except Exception:
+            continue
+    return out
+
+
+def _build_analysis(item: Dict, full_text: str, key_points: List[str],
+                    llm_tickers: List[str]) -> ArticleAnalysis:
     base_text = " ".join([item.get("title", ""), item.get(
         "summary", ""), full_text or ""]).strip()
-    vader = _vader.polarity_scores(base_text)["compound"]  # -1..1
+    # Each pass below scans base_text exactly once
+    vader = vader_sentiment(base_text)  # -1..1
     cashtags = extract_tickers(base_text)
-    key_points, llm_tickers = summarize_with_openai(
-        client, item["title"], full_text or item.get("summary", ""))
+    cat_score = naive_catalyst_score_pre(base_text.lower())
     tickers = sorted(set(cashtags) | set(
         [t.strip().upper() for t in llm_tickers if t.strip()]))
-    cat_score = naive_catalyst_score(base_text)
 
     return ArticleAnalysis(
         title=item["title"],
@@ -112,3 +345,30 @@ def analyze_article(client: OpenAI, item: Dict, full_text: str) -> ArticleAnalys
         catalyst_score=cat_score,
         key_points=key_points[:5] if key_points else [],
     )
+
+
+def analyze_article(client: OpenAI, item: Dict, full_text: str) -> ArticleAnalysis:
+    key_points, llm_tickers = summarize_with_openai(
+        client, item["title"], full_text or item.get("summary", ""))
+    return _build_analysis(item, full_text, key_points, llm_tickers)
+
+
+def analyze_articles_batch(client: OpenAI, pending: List[Tuple[Dict, str]]) -> Dict[str, ArticleAnalysis]:
+    """
+    Batch API counterpart of analyze_article. Returns {url: analysis} for
+    every article the batch summarized successfully.
+    """
+    summaries = summarize_batch(client, pending)
+    out: Dict[str, ArticleAnalysis] = {}
+    for item, full_text in pending:
+        if item["link"] in summaries:
+            key_points, llm_tickers = summaries[item["link"]]
+            out[item["link"]] = _build_analysis(
+                item, full_text, key_points, llm_tickers)
+    return out
+
+
+async def analyze_article_async(client: AsyncOpenAI, item: Dict, full_text: str) -> ArticleAnalysis:
+    key_points, llm_tickers = await summarize_with_openai_async(
+        client, item["title"], full_text or item.get("summary", ""))
+    return _build_analysis(item, full_text, key_points, llm_tickers)
@@ -1,5 +1,7 @@
 import os
-import requests
+import asyncio
+import aiohttp
+from functools import lru_cache
 from datetime import datetime, timedelta
 import pytz
 
@@ -7,11 +9,18 @@ NEWS_WEBHOOK = os.getenv("DISCORD_NEWS_WEBHOOK")
 RANK_WEBHOOK = os.getenv("DISCORD_RANKINGS_WEBHOOK")
 MARKET_TZ = os.getenv("MARKET_TZ", "US/Eastern")
 WINDOW_HOURS = int(os.getenv("DISCORD_WINDOW_HOURS", "8"))
+_MARKET_TZ = pytz.timezone(MARKET_TZ)
+_POST_RETRIES = 3
 
 
 def _tznow():
-    tz = pytz.timezone(MARKET_TZ)
-    return datetime.now(tz)
+    return datetime.now(_MARKET_TZ)
+
+
+@lru_cache(maxsize=1024)
+def _parse_iso(iso_str: str):
+    # Python 3.11+ fromisoformat accepts a trailing "Z" natively
+    return datetime.fromisoformat(iso_str)
 
 
 def _fmt_dt(dt_obj):
@@ -19,13 +28,7 @@ def _fmt_dt(dt_obj):
     return dt_obj.strftime("%b %d, %Y %I:%M %p %Z")
 
 
-def _join(*parts):
-    return "\n".join([p for p in parts if p])
-
-
-def _post_discord_chunked(webhook_url: str, content: str, max_len: int = 1900):
-    if not webhook_url:
-        return False, "Webhook not set"
+def _chunk(content: str, max_len: int = 1900) -> list:
     lines = (content or "").splitlines()
     chunks, buf = [], ""
     for ln in lines:
@@ -36,25 +39,63 @@ def _post_discord_chunked(webhook_url: str, content: str, max_len: int = 1900):
             buf = f"{buf}\n{ln}" if buf else ln
     if buf:
         chunks.append(buf)
+    return chunks
+
+
+async def _post_chunk(session: aiohttp.ClientSession, webhook_url: str, content: str):
+    # Only 429s are retried (Discord rejected the message, honour Retry-After).
+    # Webhook POSTs aren't idempotent: a 5xx may still have been delivered, so
+    # retrying it could post the same chunk twice.
+    attempt = 0
+    while True:
+        async with session.post(webhook_url, json={"content": content}) as r:
+            text = await r.text()
+            if r.status != 429 or attempt == _POST_RETRIES:
+                return 200 <= r.status < 300, f"{r.status} {text[:120]}"
+            try:
+                delay = float(r.headers.get("Retry-After", 1.0))
+            except ValueError:
+                delay = 1.0
+        attempt += 1
+        await asyncio.sleep(delay)
+
+
+async def _post_discord_chunked_async(session: aiohttp.ClientSession, webhook_url: str,
+                                      content: str, max_len: int = 1900):
+    if not webhook_url:
+        return False, "Webhook not set"
+    chunks = _chunk(content, max_len)
 
+    # Chunks of one message go out in order (Discord shows them as posted);
+    # the speedup comes from the shared connection and running webhooks side by side.
     all_ok = True
     last_info = ""
     for ch in chunks:
         try:
-            r = requests.post(webhook_url, json={"content": ch}, timeout=10)
-            ok = 200 <= r.status_code < 300
+            ok, last_info = await _post_chunk(session, webhook_url, ch)
             all_ok = all_ok and ok
-            last_info = f"{r.status_code} {r.text[:120]}"
         except Exception as e:
             all_ok = False
             last_info = str(e)
     return all_ok, f"sent {len(chunks)} chunk(s): {last_info}"
 
 
-def send_news_digest(articles: list):
+async def _post_many(posts: list):
+    # posts: [(webhook_url, content), ...] -> [(ok, info), ...]
+    timeout = aiohttp.ClientTimeout(total=10)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        return await asyncio.gather(
+            *[_post_discord_chunked_async(session, url, content) for url, content in posts])
+
+
+def _post_discord_chunked(webhook_url: str, content: str):
+    return asyncio.run(_post_many([(webhook_url, content)]))[0]
+
+
+def _news_digest_content(articles: list) -> str:
     """
     articles: list of dicts like your storage.recent_articles() returns
-    Filters to WINDOW_HOURS in MARKET_TZ and posts a compact digest to NEWS_WEBHOOK.
+    Filters to WINDOW_HOURS in MARKET_TZ and builds a compact digest.
     """
     now = _tznow()
     cutoff = now - timedelta(hours=WINDOW_HOURS)
@@ -63,11 +104,10 @@ def send_news_digest(articles: list):
     def _to_local(iso_str):
         # Example: "2025-10-14T13:10:00+00:00"
         try:
-            dt_utc = datetime.fromisoformat(iso_str.replace("Z", "+00:00"))
+            dt_utc = _parse_iso(iso_str)
         except Exception:
             return None, None
-        tz = pytz.timezone(MARKET_TZ)
-        dt_local = dt_utc.astimezone(tz)
+        dt_local = dt_utc.astimezone(_MARKET_TZ)
         return dt_utc, dt_local
 
     recent = []
@@ -83,27 +123,24 @@ def send_news_digest(articles: list):
     if not recent:
         header = f"**Daily Financial News — {_fmt_dt(now)}**"
         body = "_No new articles in the last {}h_".format(WINDOW_HOURS)
-        return _post_discord_chunked(NEWS_WEBHOOK, _join(header, body))  # type: ignore
+        return f"{header}\n{body}"
 
     # Sort newest first
     recent.sort(key=lambda x: x[0], reverse=True)
 
-    # Build lines (keep it tight)
-    lines = []
+    # Build message lines (keep it tight); every entry is non-empty
+    msg = [f"**Daily Financial News — {_fmt_dt(now)}**"]
     for loc_dt, a in recent[:20]:  # cap to avoid exceeding Discord length
         tickers = ", ".join(a.get("tickers", [])[:5]) or "—"
         time_str = loc_dt.strftime("%H:%M")
         title = a.get("title", "")[:140]
         src = a.get("source", "")
-        lines.append(f"• [{time_str}] {src}: {title} — ({tickers})")
-
-    header = f"**Daily Financial News — {_fmt_dt(now)}**"
-    footer = f"_Window: last {WINDOW_HOURS}h • TZ: {MARKET_TZ}_"
-    # type: ignore
-    return _post_discord_chunked(NEWS_WEBHOOK, _join(header, *lines, footer)) # type: ignore
+        msg.append(f"• [{time_str}] {src}: {title} — ({tickers})")
+    msg.append(f"_Window: last {WINDOW_HOURS}h • TZ: {MARKET_TZ}_")
+    return "\n".join(msg)
 
 
-def send_rankings_digest(ranked: list, verdict: dict | None):
+def _rankings_digest_content(ranked: list, verdict: dict | None) -> str:
     """
     ranked: list of tuples (ticker, score, bucket) from scorer.to_ranked_list(...)
     verdict: dict with keys { picks: [...], verdict: "..." } or None
@@ -112,18 +149,16 @@ def send_rankings_digest(ranked: list, verdict: dict | None):
     header = f"**Daily Rankings — {_fmt_dt(now)}**"
 
     if not ranked:
-        # type: ignore
-        return _post_discord_chunked(RANK_WEBHOOK, _join(header, "_No ranked tickers yet_")) # type: ignore
+        return f"{header}\n_No ranked tickers yet_"
 
-    lines = []
+    # Every entry appended below is non-empty, so no filtering pass on join
+    msg_parts = [header]
     for i, (t, score, bucket) in enumerate(ranked[:10], start=1):
         s = f"{score:.3f}"
         # include a short recent headline for context if present
         hl = bucket["articles"][0]["title"] if bucket.get("articles") else ""
         hl = (hl[:90] + "…") if len(hl) > 93 else hl
-        lines.append(f"{i}. **{t}** — score {s} — {hl}")
-
-    msg_parts = [header, *lines]
+        msg_parts.append(f"{i}. **{t}** — score {s} — {hl}")
 
     if verdict:
         picks = verdict.get("picks", [])[:6]
@@ -138,4 +173,30 @@ def send_rankings_digest(ranked: list, verdict: dict | None):
             vtxt = (vtxt[:400] + "…") if len(vtxt) > 403 else vtxt
             msg_parts.append(f"\n**Verdict:** {vtxt}")
 
-    return _post_discord_chunked(RANK_WEBHOOK, _join(*msg_parts))  # type: ignore
+    return "\n".join(msg_parts)
+
+
+def send_news_digest(articles: list):
+    """
+    Posts the WINDOW_HOURS news digest to NEWS_WEBHOOK.
+    """
+    return _post_discord_chunked(NEWS_WEBHOOK, _news_digest_content(articles))  # type: ignore
+
+
+def send_rankings_digest(ranked: list, verdict: dict | None):
+    """
+    Posts the ticker rankings + LLM verdict to RANK_WEBHOOK.
+    """
+    return _post_discord_chunked(RANK_WEBHOOK, _rankings_digest_content(ranked, verdict))  # type: ignore
+
+
+def send_digests(articles: list, ranked: list, verdict: dict | None):
+    """
+    send_news_digest + send_rankings_digest, posted concurrently over one
+    connection pool. Returns ((ok_news, info_news), (ok_rank, info_rank)).
+    """
+    news, rank = asyncio.run(_post_many([
+        (NEWS_WEBHOOK, _news_digest_content(articles)),
+        (RANK_WEBHOOK, _rankings_digest_content(ranked, verdict)),
+    ]))
+    return news, rank
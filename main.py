@@ -1,11 +1,15 @@
 import os
 import json
+import fcntl
+import asyncio
+import tempfile
+from contextlib import contextmanager
 import pytz
 import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
 from apscheduler.schedulers.background import BackgroundScheduler
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 import news_sources as ns
 import analyzer as az
@@ -22,7 +26,15 @@ st.set_page_config(page_title="AI News Automation - Wharton", layout="wide")
 MARKET_TZ = os.getenv("MARKET_TZ", "US/Eastern")
 CRONS = os.getenv("SCHEDULE_CRONS", "9:15,12:30,16:10")
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+OPENAI_CONCURRENCY = int(os.getenv("OPENAI_CONCURRENCY", "10"))
+# Scheduled runs can wait for the (cheaper) Batch API; "Run now" never does
+USE_BATCH = os.getenv("OPENAI_USE_BATCH", "0") == "1"
+PIPELINE_LOCK = os.getenv("PIPELINE_LOCK", os.path.join(
+    tempfile.gettempdir(), "news_pipeline.lock"))
 MODEL = os.getenv("OPENAI_MODEL", "gpt-5-mini")
+# Everything the ranking, Discord digest and UI read (no summary/full_text)
+DIGEST_FIELDS = ("url", "title", "source", "published_at", "source_weight",
+                 "tickers", "sentiment", "catalyst_score", "key_points")
 
 
 def start_scheduler():
@@ -32,7 +44,7 @@ def start_scheduler():
     times = [t.strip() for t in CRONS.split(",") if t.strip()]
     for t in times:
         hh, mm = [int(x) for x in t.split(":")]
-        scheduler.add_job(lambda: do_scheduled_run(send_discord=True),
+        scheduler.add_job(lambda: do_scheduled_run(send_discord=True, use_batch=USE_BATCH),
                           "cron", hour=hh, minute=mm, misfire_grace_time=600)
     scheduler.start()
     st.session_state.scheduler_started = True
@@ -48,45 +60,97 @@ if "scheduler_started" not in st.session_state:
     st.session_state.scheduler_started = False
 
 
-def do_scheduled_run(send_discord: bool = True):
-    # 1) fetch/analyze/save
-    added = run_pipeline()
+@contextmanager
+def _pipeline_lock():
+    # Streamlit reloads can leave several schedulers alive; only one may run
+    # the pipeline (and pay for OpenAI calls) at a time, the rest no-op.
+    with open(PIPELINE_LOCK, "w") as f:
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
 
-    # 2) build ranking + verdict
-    top, verdict = build_ranking_and_verdict()
-    st.session_state["top"] = top
-    st.session_state["verdict"] = verdict
 
-    # 3) Discord pings (two channels)
-    if send_discord:
-        arts = db.recent_articles(limit=200)
-        ok1, info1 = dn.send_news_digest(arts)
-        ok2, info2 = dn.send_rankings_digest(top, verdict)
-        st.toast(
-            f"Discord news: {'OK' if ok1 else 'ERR'} | rankings: {'OK' if ok2 else 'ERR'}", icon="📣")
-    return added
+def do_scheduled_run(send_discord: bool = True, use_batch: bool = False):
+    with _pipeline_lock() as acquired:
+        if not acquired:
+            st.toast("Pipeline already running; skipped this run.", icon="⏭️")
+            return 0
+
+        # 1) fetch/analyze/save
+        added = run_pipeline(use_batch=use_batch)
+
+        # 2) build ranking + verdict
+        top, verdict = build_ranking_and_verdict()
+        st.session_state["top"] = top
+        st.session_state["verdict"] = verdict
 
+        # 3) Discord pings (two channels)
+        if send_discord:
+            arts = db.recent_articles(limit=200, fields=DIGEST_FIELDS)
+            (ok1, info1), (ok2, info2) = dn.send_digests(arts, top, verdict)
+            st.toast(
+                f"Discord news: {'OK' if ok1 else 'ERR'} | rankings: {'OK' if ok2 else 'ERR'}", icon="📣")
+        return added
 
-def run_pipeline():
+
+async def _analyze_all(pending):
+    # Summarize concurrently, capped so we stay under OpenAI's RPM/TPM limits.
+    # The async client is bound to this run's event loop (asyncio.run makes a
+    # new one each time), so it is created and closed here.
+    sem = asyncio.Semaphore(OPENAI_CONCURRENCY)
+    async with AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY")) as aclient:
+
+        async def _one(it, full_text):
+            async with sem:
+                return await az.analyze_article_async(aclient, it, full_text)
+
+        return await asyncio.gather(*[_one(it, ft) for it, ft in pending],
+                                    return_exceptions=True)
+
+
+def run_pipeline(use_batch: bool = False):
     st.toast("Fetching feeds…", icon="📰")
     items = ns.fetch_rss_items()
     st.toast(
         f"Fetched {len(items)} items. Pulling full text + summarizing…", icon="⏳")
-    added = 0
 
+    seen = db.existing_urls(it["link"] for it in items)
+    new_items = []
     for it in items:
-        if db.article_exists(it["link"]):
+        if it["link"] in seen:
             continue
-        full_text = ns.fetch_full_text(it["link"])
-        analysis = az.analyze_article(client, it, full_text).model_dump()
-        db.save_article(analysis)
-        added += 1
+        seen.add(it["link"])
+        new_items.append(it)
+    texts = ns.fetch_full_text_many(it["link"] for it in new_items)
+    pending = [(it, texts.get(it["link"], "")) for it in new_items]
+
+    analyses = []
+    if use_batch and pending:
+        done = az.analyze_articles_batch(client, pending)
+        analyses.extend(done.values())
+        # Anything the batch couldn't summarize goes through the async path
+        pending = [(it, ft) for it, ft in pending if it["link"] not in done]
+
+    errors = []
+    for res in asyncio.run(_analyze_all(pending)):
+        if isinstance(res, BaseException):
+            errors.append(res)
+        else:
+            analyses.append(res)
+    if errors:
+        st.toast(
+            f"{len(errors)} article(s) failed to summarize; first error: {errors[0]!r}", icon="⚠️")
+    db.save_articles_many(a.model_dump() for a in analyses)
+    added = len(analyses)
     st.toast(f"Saved {added} new articles.", icon="✅")
     return added
 
 
 def build_ranking_and_verdict():
-    arts = db.recent_articles(limit=300)
+    arts = db.recent_articles(limit=300, fields=DIGEST_FIELDS)
     per_ticker = sc.score_articles_by_ticker(arts)
     top = sc.to_ranked_list(per_ticker, top_n=10)
 
@@ -158,11 +222,10 @@ with colB:
         st.success("Verdict ready below.")
 
     if st.button("Send Discord now", use_container_width=True):
-        arts = db.recent_articles(limit=200)
-        ok1, info1 = dn.send_news_digest(arts)
+        arts = db.recent_articles(limit=200, fields=DIGEST_FIELDS)
         top = st.session_state.get("top", [])
         verdict = st.session_state.get("verdict", {})
-        ok2, info2 = dn.send_rankings_digest(top, verdict)
+        (ok1, info1), (ok2, info2) = dn.send_digests(arts, top, verdict)
         st.success(
             f"Discord news: {'OK' if ok1 else 'ERR'}; rankings: {'OK' if ok2 else 'ERR'}")
 
@@ -176,7 +239,7 @@ with colC:
 st.divider()
 
 # Latest articles
-arts = db.recent_articles(limit=50)
+arts = db.recent_articles(limit=50, fields=DIGEST_FIELDS)
 st.subheader("Latest news (most recent first)")
 if arts:
     df = pd.DataFrame([{
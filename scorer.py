@@ -1,5 +1,10 @@
+import time
+import threading
 import datetime as dt
-from typing import Dict, List, Tuple
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+import pandas as pd
 import yfinance as yf
 
 # Weights for the composite score
@@ -9,6 +14,14 @@ W_CATALYST = 0.20
 W_RECENCY = 0.15
 W_MARKET_REACTION = 0.10  # price/volume confirmation
 
+# Daily bars barely move intraday; reuse reaction signals across reruns
+REACTION_TTL_SECONDS = 15 * 60
+REACTION_CACHE_SIZE = 256
+# ticker -> (fetched_at, score), oldest first. Shared by the Streamlit script
+# thread and the scheduler thread, so every access goes through the lock.
+_reaction_cache: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+_reaction_lock = threading.Lock()
+
 
 def recency_weight(published_iso: str, now: dt.datetime) -> float:
     try:
@@ -27,34 +40,91 @@ def recency_weight(published_iso: str, now: dt.datetime) -> float:
     return 0.5
 
 
-def market_reaction_signal(ticker: str) -> float:
+def recency_weight_vec(published_iso: pd.Series, now: dt.datetime) -> pd.Series:
+    """
+    Array-wise recency_weight: same buckets, 0.7 where the timestamp doesn't parse.
     """
-    Quick confirmation via yfinance:
+    published = pd.to_datetime(
+        published_iso, utc=True, errors="coerce", format="ISO8601")
+    hours = ((now - published).dt.total_seconds() / 3600.0).clip(lower=0.0)
+    weights = pd.Series(np.select(
+        [hours <= 2, hours <= 24, hours <= 48], [1.0, 0.9, 0.75], default=0.5),
+        index=published_iso.index)
+    return weights.where(published.notna(), 0.7)
+
+
+def _reaction_score(data) -> float:
+    if data is None or len(data) < 21:
+        return 0.0
+    today = data.iloc[-1]
+    prev = data.iloc[-2]
+    avg_vol = data["Volume"].iloc[-21:-1].mean()
+    pct = (today["Close"]/prev["Close"] - 1.0) * 100.0
+    vol_mult = (today["Volume"]/max(1, avg_vol))
+    score = 0.0
+    if pct > 1.5:
+        score += 0.5
+    if pct < -1.5:
+        score -= 0.5
+    if vol_mult > 1.5:
+        score += 0.5
+    if vol_mult < 0.6:
+        score -= 0.3
+    return max(-1.0, min(1.0, score))
+
+
+def market_reaction_signals(tickers: Iterable[str]) -> Dict[str, float]:
+    """
+    Quick confirmation via yfinance, one download for all tickers:
     - +0.5 if today's %ch > +1.5%
     - +0.5 if today's volume > 1.5x 20-day avg
     - negative mirror for downside
+    Results are cached for REACTION_TTL_SECONDS.
     """
+    tickers = list(dict.fromkeys(tickers))
+    now = time.monotonic()
+    out: Dict[str, float] = {}
+    missing = []
+    with _reaction_lock:
+        for t in tickers:
+            hit = _reaction_cache.get(t)
+            if hit and now - hit[0] < REACTION_TTL_SECONDS:
+                out[t] = hit[1]
+            else:
+                missing.append(t)
+    if not missing:
+        return out
+
     try:
-        data = yf.download(ticker, period="1mo", interval="1d", progress=False)
-        if data is None or len(data) < 21:
-            return 0.0
-        today = data.iloc[-1]
-        prev = data.iloc[-2]
-        avg_vol = data["Volume"].iloc[-21:-1].mean()
-        pct = (today["Close"]/prev["Close"] - 1.0) * 100.0
-        vol_mult = (today["Volume"]/max(1, avg_vol))
-        score = 0.0
-        if pct > 1.5:
-            score += 0.5
-        if pct < -1.5:
-            score -= 0.5
-        if vol_mult > 1.5:
-            score += 0.5
-        if vol_mult < 0.6:
-            score -= 0.3
-        return max(-1.0, min(1.0, score))
+        data = yf.download(missing, period="1mo", interval="1d",
+                           group_by="ticker", progress=False, threads=True)
     except Exception:
-        return 0.0
+        data = None
+    fresh: Dict[str, float] = {}
+    for t in missing:
+        score = 0.0
+        if data is not None:
+            try:
+                frame = data[t] if isinstance(
+                    data.columns, pd.MultiIndex) else data
+                score = _reaction_score(frame.dropna(subset=["Close"]))
+            except Exception:
+                pass
+            fresh[t] = score
+        out[t] = score
+
+    with _reaction_lock:
+        for t, score in fresh.items():
+            _reaction_cache[t] = (now, score)
+            _reaction_cache.move_to_end(t)
+        # Evict oldest entries beyond the cap
+        while len(_reaction_cache) > REACTION_CACHE_SIZE:
+            _reaction_cache.popitem(last=False)
+    return out
+
+
+def market_reaction_signal(ticker: str) -> float:
+    return market_reaction_signals([ticker])[ticker]
 
 
 def score_articles_by_ticker(articles: List[dict]) -> Dict[str, Dict]:
@@ -63,24 +133,41 @@ def score_articles_by_ticker(articles: List[dict]) -> Dict[str, Dict]:
     """
     now = dt.datetime.now(dt.timezone.utc)
     per_ticker: Dict[str, Dict] = {}
-    for a in articles:
-        if not a["tickers"]:
-            continue
-        r_w = recency_weight(a["published_at"], now)
-        art_score = (
-            W_SOURCE * float(a["source_weight"]) +
-            W_SENTIMENT * float(a["sentiment"]) +
-            W_CATALYST * float(a["catalyst_score"]) +
-            W_RECENCY * r_w
-        )
-        for t in a["tickers"]:
-            bucket = per_ticker.setdefault(t, {"score": 0.0, "articles": []})
-            bucket["score"] += art_score
-            bucket["articles"].append(a)
-
-    # Add market reaction confirmation
+    if not articles:
+        return per_ticker
+
+    # Only the scoring columns; row labels index back into `articles`
+    df = pd.DataFrame({
+        "tickers": [a["tickers"] for a in articles],
+        "published_at": [a["published_at"] for a in articles],
+        "source_weight": [a["source_weight"] for a in articles],
+        "sentiment": [a["sentiment"] for a in articles],
+        "catalyst_score": [a["catalyst_score"] for a in articles],
+    })
+    df = df[df["tickers"].map(bool)]
+    if df.empty:
+        return per_ticker
+    df["recency"] = recency_weight_vec(df["published_at"], now)
+    df["art_score"] = (
+        W_SOURCE * df["source_weight"].astype(float) +
+        W_SENTIMENT * df["sentiment"].astype(float) +
+        W_CATALYST * df["catalyst_score"].astype(float) +
+        W_RECENCY * df["recency"]
+    )
+
+    grouped = df[["tickers", "art_score"]].explode(
+        "tickers").groupby("tickers", sort=False)
+    scores = grouped["art_score"].sum()
+    for t, idx in grouped.groups.items():
+        per_ticker[t] = {
+            "score": float(scores[t]),
+            "articles": [articles[i] for i in idx],
+        }
+
+    # Add market reaction confirmation (single batched download)
+    reactions = market_reaction_signals(per_ticker.keys())
     for t, bucket in per_ticker.items():
-        bucket["score"] += W_MARKET_REACTION * market_reaction_signal(t)
+        bucket["score"] += W_MARKET_REACTION * reactions.get(t, 0.0)
 
     # Sort articles by recency inside each bucket
     for t, bucket in per_ticker.items():
@@ -1,5 +1,6 @@
 import sqlite3
-from typing import List, Dict, Any
+import threading
+from typing import Iterable, List, Dict, Any, Optional, Set
 import json
 import os
 
@@ -21,64 +22,138 @@ CREATE TABLE IF NOT EXISTS articles (
   key_points TEXT,      -- JSON array
   created_at TEXT DEFAULT (datetime('now'))
 );
+-- published_at holds UTC ISO-8601 strings, which sort lexicographically
+CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at DESC);
+
+-- LLM summaries keyed by content hash, so reprints/retries skip the API call
+CREATE TABLE IF NOT EXISTS llm_cache (
+  hash TEXT PRIMARY KEY,
+  result TEXT           -- JSON object
+);
 """
 
 
 def get_conn():
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     conn.execute("PRAGMA journal_mode=WAL;")
+    conn.execute("PRAGMA synchronous=NORMAL;")
     return conn
 
 
+ARTICLE_FIELDS = (
+    "url", "title", "source", "published_at", "source_weight", "summary", "full_text",
+    "tickers", "sentiment", "catalyst_score", "key_points",
+)
+_JSON_FIELDS = ("tickers", "key_points")
+
+
+# One shared connection for the process (Streamlit reruns + scheduler thread);
+# sqlite3 connections aren't safe to use concurrently, so guard with a lock.
+_CONN = get_conn()
+_LOCK = threading.Lock()
+
+
 def init_db():
-    conn = get_conn()
-    conn.execute(DDL)
-    conn.commit()
-    conn.close()
+    # Streamlit calls this on every rerun, so only gather planner stats once,
+    # when the published_at index is first created
+    with _LOCK, _CONN:
+        had_index = _CONN.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_articles_published_at'"
+        ).fetchone() is not None
+        _CONN.executescript(DDL)
+        if not had_index:
+            _CONN.execute("ANALYZE;")
 
 
 def article_exists(url: str) -> bool:
-    conn = get_conn()
-    cur = conn.execute("SELECT 1 FROM articles WHERE url = ? LIMIT 1", (url,))
-    row = cur.fetchone()
-    conn.close()
-    return row is not None
+    with _LOCK:
+        cur = _CONN.execute(
+            "SELECT 1 FROM articles WHERE url = ? LIMIT 1", (url,))
+        return cur.fetchone() is not None
+
+
+def existing_urls(urls: Iterable[str]) -> Set[str]:
+    """
+    Subset of urls already stored, in as few queries as possible.
+    """
+    urls = list(urls)
+    found: Set[str] = set()
+    with _LOCK:
+        for i in range(0, len(urls), 500):  # stay under SQLite's variable limit
+            chunk = urls[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            cur = _CONN.execute(
+                f"SELECT url FROM articles WHERE url IN ({marks})", chunk)
+            found.update(r[0] for r in cur.fetchall())
+    return found
+
+
+def _article_row(a: Dict[str, Any]) -> tuple:
+    return (
+        a["url"], a["title"], a["source"], a["published_at"], a["source_weight"],
+        a["summary"], a["full_text"], json.dumps(a["tickers"]),
+        a["sentiment"], a["catalyst_score"], json.dumps(a["key_points"]),
+    )
 
 
 def save_article(a: Dict[str, Any]):
-    conn = get_conn()
-    conn.execute(
-        """INSERT OR IGNORE INTO articles
+    save_articles_many([a])
+
+
+def save_articles_many(batch: Iterable[Dict[str, Any]]):
+    """
+    Insert many articles in a single transaction (one commit/fsync total).
+    """
+    rows = [_article_row(a) for a in batch]
+    if not rows:
+        return
+    with _LOCK, _CONN:
+        _CONN.executemany(
+            """INSERT OR IGNORE INTO articles
         (url, title, source, published_at, source_weight, summary, full_text,
          tickers, sentiment, catalyst_score, key_points)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-        (
-            a["url"], a["title"], a["source"], a["published_at"], a["source_weight"],
-            a["summary"], a["full_text"], json.dumps(a["tickers"]),
-            a["sentiment"], a["catalyst_score"], json.dumps(a["key_points"]),
+            rows,
         )
-    )
-    conn.commit()
-    conn.close()
 
 
-def recent_articles(limit: int = 200) -> List[Dict[str, Any]]:
-    conn = get_conn()
-    cur = conn.execute(
-        """SELECT url, title, source, published_at, source_weight, summary, full_text,
-                  tickers, sentiment, catalyst_score, key_points
-           FROM articles ORDER BY datetime(published_at) DESC NULLS LAST, id DESC LIMIT ?""",
-        (limit,)
-    )
-    rows = cur.fetchall()
-    conn.close()
+def get_llm_cache(h: str) -> Optional[Dict[str, Any]]:
+    with _LOCK:
+        cur = _CONN.execute("SELECT result FROM llm_cache WHERE hash = ?", (h,))
+        row = cur.fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def put_llm_cache(h: str, result: Dict[str, Any]):
+    with _LOCK, _CONN:
+        _CONN.execute("INSERT OR REPLACE INTO llm_cache (hash, result) VALUES (?, ?)",
+                      (h, json.dumps(result)))
+
+
+def recent_articles(limit: int = 200, fields: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Most recent articles first. Pass `fields` (subset of ARTICLE_FIELDS) to
+    skip loading columns you don't need -- full_text is by far the largest.
+    """
+    cols = list(fields) if fields else list(ARTICLE_FIELDS)
+    unknown = set(cols) - set(ARTICLE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown article fields: {sorted(unknown)}")
+    json_cols = [c for c in cols if c in _JSON_FIELDS]
+
+    with _LOCK:
+        cur = _CONN.cursor()
+        cur.row_factory = sqlite3.Row
+        cur.execute(
+            f"""SELECT {", ".join(cols)}
+           FROM articles ORDER BY published_at DESC, id DESC LIMIT ?""",
+            (limit,)
+        )
+        rows = cur.fetchall()
     out = []
     for r in rows:
-        out.append({
-            "url": r[0], "title": r[1], "source": r[2], "published_at": r[3],
-            "source_weight": r[4], "summary": r[5], "full_text": r[6],
-            "tickers": json.loads(r[7] or "[]"),
-            "sentiment": r[8], "catalyst_score": r[9],
-            "key_points": json.loads(r[10] or "[]"),
-        })
+        a = dict(r)
+        for c in json_cols:
+            a[c] = json.loads(a[c] or "[]")
+        out.append(a)
     return out